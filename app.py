@@ -12,22 +12,14 @@ source_file = st.file_uploader("Upload Source File", type=["xlsx"])
 staff_file = st.file_uploader("Upload Staff Specialty File", type=["xlsx"])
 
 if source_file and staff_file:
-    # Save uploaded files to temporary files
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as src_tmp:
-        src_path = src_tmp.name
-        src_tmp.write(source_file.getbuffer())
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as staff_tmp:
-        staff_path = staff_tmp.name
-        staff_tmp.write(staff_file.getbuffer())
-
     # Output temporary file
     with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as out_tmp:
         output_path = out_tmp.name
 
     # Show loading spinner while processing
     with st.spinner("Generating output file... Please wait."):
-        generate_output(src_path, staff_path, output_path)  # your function should save output to output_path
+        # Uploaded files are in-memory file objects; openpyxl reads them directly
+        generate_output(source_file, staff_file, output_path)  # your function should save output to output_path
 
     st.success("Output generated successfully!")
 
@@ -41,5 +33,4 @@ if source_file and staff_file:
         )
 
     # Optional: cleanup temp files
-    os.remove(src_path)
-    os.remove(staff_path)
+    os.remove(output_path)
@@ -1,8 +1,18 @@
+import csv
+import logging
 import re
-import random
+import sys
+import zlib
+from copy import copy
+from collections import namedtuple
+from functools import lru_cache
 from openpyxl import load_workbook, Workbook
 from openpyxl.styles import Font, PatternFill
-from openpyxl.utils import range_boundaries
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import range_boundaries, get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidationList
+from openpyxl.xml.constants import SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
 
 # ---------- CONFIG ----------
 TARGET_SHEETS = ["AKUN", "WAMA", "GALAXEA"]
@@ -10,232 +20,365 @@ TARGET_RED = "FFC00000"
 HEADERS = ["Event", "Resource", "Configuration", "Date", "Start Time", "End Time"]
 HEADER_FILL = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
 HEADER_FONT = Font(bold=True)
+COLUMN_WIDTHS = (30, 30, 30, 12, 10, 10)
 YEAR_FOR_OUTPUT = 2025
+DV_TAG = "{%s}dataValidations" % SHEET_MAIN_NS
+ROW_TAG = "{%s}row" % SHEET_MAIN_NS
+SHEET_DATA_TAG = "{%s}sheetData" % SHEET_MAIN_NS
 
 # ---------- LOGGING ----------
 log_lines = []
+# per-row detail; formatted only when DEBUG is enabled
+logger = logging.getLogger(__name__)
 
 def log(msg):
     log_lines.append(msg)
     print(msg)  # optional for local testing
 
 # ---------- HELPERS ----------
+# fields of a source row the output pass needs, read once while streaming
+RowView = namedtuple("RowView","row activity resort month values")
+
 def safe_str(v):
-    return "" if v is None else str(v).strip()
-
-def get_rgb(cell):
-    if cell is None: return None
-    fill = getattr(cell, "fill", None)
-    if not fill: return None
-    color = getattr(fill, "start_color", None)
-    if color is None: return None
-    if hasattr(color, "rgb") and color.rgb: return str(color.rgb).upper()
-    return None
+    if v is None: return ""
+    if type(v) is str: return v.strip()  # most cells; skip the str() call
+    return str(v).strip()
+
+def load_read_only(path):
+    wb = load_workbook(path,data_only=True,read_only=True)
+    # read_only trusts each sheet's <dimension>, which many writers leave stale
+    for ws in wb.worksheets: ws.reset_dimensions()
+    return wb
 
-def is_red(cell):
-    return get_rgb(cell) == TARGET_RED
+def get_red_style_ids(wb):
+    # a cell is red when its style points at a red fill, so resolve that per style once
+    red_fills = set()
+    for fill_id,fill in enumerate(wb._fills):
+        try:
+            # aRGB is kept as written, so "ffc00000" must match too
+            if str(fill.start_color.rgb).upper() == TARGET_RED: red_fills.add(fill_id)
+        except AttributeError: continue
+    return {style_id for style_id,style in enumerate(wb._cell_styles) if style.fillId in red_fills}
 
+MONTH_MAP = {
+    "january":1,"jan":1,"february":2,"feb":2,"march":3,"mar":3,
+    "april":4,"apr":4,"may":5,"june":6,"jun":6,"july":7,"jul":7,
+    "august":8,"aug":8,"september":9,"sep":9,"sept":9,
+    "october":10,"oct":10,"november":11,"nov":11,"december":12,"dec":12
+}
+# every month name is unique in its first three letters
+MONTH3 = {k[:3]:v for k,v in MONTH_MAP.items()}
+MONTH_RE = re.compile("|".join(sorted(MONTH_MAP,key=len,reverse=True)))
+BRACKETS_RE = re.compile(r"\s*\(.*?\)\s*")
+
+@lru_cache(maxsize=256)
 def parse_month_to_num(month_value):
     if month_value is None: return None
     s = str(month_value).strip()
     if not s: return None
     if s.isdigit() and 1 <= int(s) <= 12: return int(s)
-    MONTH_MAP = {
-        "january":1,"jan":1,"february":2,"feb":2,"march":3,"mar":3,
-        "april":4,"apr":4,"may":5,"june":6,"jun":6,"july":7,"jul":7,
-        "august":8,"aug":8,"september":9,"sep":9,"sept":9,
-        "october":10,"oct":10,"november":11,"nov":11,"december":12,"dec":12
-    }
     key = s.lower()
     if key in MONTH_MAP: return MONTH_MAP[key]
-    for name,num in MONTH_MAP.items():
-        if name in key: return num
+    if key[:3] in MONTH3: return MONTH3[key[:3]]  # "Sept.", "March 2025"
+    m = MONTH_RE.search(key)
+    return MONTH_MAP[m.group()] if m else None
+
+@lru_cache(maxsize=None)
+def split_slot(slot):
+    # "9:00 - 10:00" -> ("9:00","10:00"); only a few distinct slots per workbook
+    slot = slot.strip()
+    if not slot: return None
+    start,sep,end = slot.partition("-")
+    if not sep: return slot,""
+    return start.strip(),end.strip()
+
+def get_day_columns(header,start_idx,stop_idx):
+    # (row index, day number) for every date column with a numeric header
+    day_cols = []
+    for idx in range(start_idx,stop_idx):
+        try: day_cols.append((idx,int(header[idx])))
+        except (TypeError,ValueError): continue
+    return day_cols
+
+def find_first_day(row,day_cols):
+    for idx,day in day_cols:
+        v = row[idx]
+        if isinstance(v,(int,float)):
+            if v>0: return day
+        elif isinstance(v,str):
+            # numbers typed in as text still count; only this rare path can raise
+            try:
+                if float(v)>0: return day
+            except ValueError: continue
     return None
 
 def add_headers(ws):
-    for col_idx,h in enumerate(HEADERS,start=1):
-        c = ws.cell(row=1,column=col_idx,value=h)
+    cells = []
+    for h in HEADERS:
+        c = WriteOnlyCell(ws,value=h)
         c.font = HEADER_FONT
         c.fill = HEADER_FILL
+        cells.append(c)
+    ws.append(cells)
 
+@lru_cache(maxsize=256)
 def clean_instructor_name(name):
     if not name: return None
-    return re.sub(r"\s*\(.*?\)\s*","",str(name)).strip()
-
-def get_light_fill():
-    colors = ["FFFFE5CC","FFE5FFCC","FFCCFFE5","FFCCE5FF",
-              "FFFFCCFF","FFE5CCFF","FFFFCCCC","FFCCFFFF"]
-    hexcolor = random.choice(colors)
-    return PatternFill(start_color=hexcolor,end_color=hexcolor,fill_type="solid")
-
-# ---------- PRELOAD DROPDOWN ----------
-def preload_dropdowns(wb):
-    dropdown_map = {}
-    for ws in wb.worksheets:
-        if not hasattr(ws,"data_validations"): continue
-        for dv in ws.data_validations.dataValidation:
-            if dv.type != "list" or not dv.formula1: continue
-            formula = dv.formula1.strip()
-            if formula.startswith('"') and formula.endswith('"'): continue
-            if formula.startswith("="): formula = formula[1:]
-            if "!" in formula:
-                sheet_name,rng = formula.split("!")
-                sheet_name = sheet_name.strip("'")
-                if sheet_name not in wb.sheetnames: continue
-                ref_ws = wb[sheet_name]
-            else:
-                ref_ws = ws
-                rng = formula
-            try:
-                min_col,min_row,max_col,max_row = range_boundaries(rng)
-                values = []
-                for row in ref_ws.iter_rows(min_row=min_row,max_row=max_row,
-                                            min_col=min_col,max_col=max_col):
-                    for c in row:
-                        if c.value is not None: values.append(str(c.value).strip())
-                dropdown_map[(ref_ws.title,rng)] = list(dict.fromkeys(values))
-            except:
-                continue
-    return dropdown_map
-
-def get_dropdown_values(ws,cell,dropdown_map):
+    return BRACKETS_RE.sub("",str(name)).strip()
+
+LIGHT_COLORS = ["FFFFE5CC","FFE5FFCC","FFCCFFE5","FFCCE5FF",
+                "FFFFCCFF","FFE5CCFF","FFFFCCCC","FFCCFFFF"]
+LIGHT_FILLS = tuple(PatternFill(start_color=c,end_color=c,fill_type="solid") for c in LIGHT_COLORS)
+
+def get_light_fill(event_name):
+    # crc32 rather than hash(): str hashes are salted per process
+    return LIGHT_FILLS[zlib.crc32(event_name.encode())%len(LIGHT_FILLS)]
+
+# ---------- DROPDOWNS ----------
+def read_data_validations(ws):
+    # read_only sheets don't load validations, pull them from the sheet xml
+    with ws._get_source() as src:
+        sheet_data = None
+        for event,el in iterparse(src,events=("start","end")):
+            if event=="start":
+                if el.tag==SHEET_DATA_TAG: sheet_data = el
+            # cell data isn't needed here; detach each finished row so the tree stays flat
+            elif el.tag==ROW_TAG: sheet_data.remove(el)
+            elif el.tag==DV_TAG: return DataValidationList.from_tree(el).dataValidation
+    return []
+
+def read_range_values(ws,rng):
+    min_col,min_row,max_col,max_row = range_boundaries(rng)
+    values = []
+    for row in ws.iter_rows(min_row=min_row,max_row=max_row,
+                            min_col=min_col,max_col=max_col,values_only=True):
+        for v in row:
+            if v is not None: values.append(str(v).strip())
+    return list(dict.fromkeys(values))
+
+def resolve_dropdown(ws,formula,dropdown_map):
+    f = formula.strip()
+    if f.startswith('"') and f.endswith('"'):
+        return [x.strip() for x in f.strip('"').split(",")]
+    if f.startswith("="): f=f[1:]
+    if "!" in f:
+        sheet_name,rng = f.split("!")
+        sheet_name=sheet_name.strip("'")
+    else:
+        sheet_name,rng=ws.title,f
+    # resolved on first use only; validations often share the same source range
+    key = (sheet_name,rng)
+    values = dropdown_map.get(key)
+    if values is None:
+        wb = ws.parent
+        try: values = read_range_values(wb[sheet_name],rng) if sheet_name in wb.sheetnames else []
+        except (TypeError,ValueError): values = []
+        dropdown_map[key] = values
+    return values
+
+def get_column_dropdowns(ws,col,dropdown_map):
+    # [(min_row,max_row,slots)] for every list validation covering this column,
+    # slots already split into (start,end) once per sheet
+    ranges = []
+    for dv in read_data_validations(ws):
+        if dv.type!="list" or not dv.formula1: continue
+        rows = [(cr.min_row,cr.max_row) for cr in dv.sqref.ranges if cr.min_col<=col<=cr.max_col]
+        if not rows: continue  # other columns' dropdowns: don't read their source ranges
+        values = resolve_dropdown(ws,dv.formula1,dropdown_map)
+        slots = tuple(dict.fromkeys(t for t in map(split_slot,values) if t))
+        ranges.extend((min_row,max_row,slots) for min_row,max_row in rows)
+    return ranges
+
+def get_dropdown_values(ranges,row):
     dropdowns = []
-    if not hasattr(ws,"data_validations"): return dropdowns
-    for dv in ws.data_validations.dataValidation:
-        if cell.coordinate not in dv.cells or dv.type!="list" or not dv.formula1: continue
-        f = dv.formula1.strip()
-        if f.startswith('"') and f.endswith('"'):
-            dropdowns.extend([x.strip() for x in f.strip('"').split(",")])
-            continue
-        if f.startswith("="): f=f[1:]
-        if "!" in f:
-            sheet_name,rng = f.split("!")
-            sheet_name=sheet_name.strip("'")
-        else:
-            sheet_name,rng=ws.title,f
-        dropdowns.extend(dropdown_map.get((sheet_name,rng),[]))
+    for min_row,max_row,slots in ranges:
+        if min_row<=row<=max_row: dropdowns.extend(slots)
     return list(dict.fromkeys(dropdowns))
 
 # ---------- STAFF PRELOAD ----------
 def preload_staff(staff_file):
-    wb = load_workbook(staff_file,data_only=True)
+    wb = load_read_only(staff_file)
+    red_styles = get_red_style_ids(wb)
     result = {}
     for sheet in TARGET_SHEETS:
         if sheet not in wb.sheetnames: continue
         ws = wb[sheet]
-        headers = [safe_str(c.value).lower() for c in ws[1]]
-        try: pri_idx = headers.index("priority")+1
-        except: pri_idx = 1
-        instr_start_col = pri_idx+1
+        header = next(ws.iter_rows(max_row=1,values_only=True),())
         sheet_map = {}
-        for col in range(instr_start_col,ws.max_column+1):
-            instr_name = clean_instructor_name(safe_str(ws.cell(1,col).value))
-            if not instr_name: continue
-            r=2
-            while r<=ws.max_row:
-                val_cell = ws.cell(r,col)
-                val = safe_str(val_cell.value)
-                if not val: break
-                if is_red(val_cell): r+=1; continue
-                sheet_map.setdefault(val,[]).append(instr_name)
-                r+=1
         result[sheet]=sheet_map
+        if not header: continue
+        header_map = {safe_str(v).lower():i for i,v in enumerate(header,start=1)}
+        pri_idx = header_map.get("priority",1)
+        instr_start_col = pri_idx+1
+        instr_cols = []
+        for col in range(instr_start_col,len(header)+1):
+            instr_name = clean_instructor_name(safe_str(header[col-1]))
+            if instr_name: instr_cols.append((col-1,instr_name))
+        # one streaming pass; each column stops at its first blank cell and
+        # reading stops once every column has
+        col_vals = [[] for _ in instr_cols]
+        active = list(range(len(instr_cols)))
+        for row in ws.iter_rows(min_row=2,max_col=len(header)):
+            if not active: break
+            still_active = []
+            for i in active:
+                val_cell = row[instr_cols[i][0]]
+                val = safe_str(val_cell.value)
+                if not val: continue
+                still_active.append(i)
+                if val_cell._style_id not in red_styles: col_vals[i].append(val)
+            active = still_active
+        for (_,instr_name),vals in zip(instr_cols,col_vals):
+            # interned so lookups with the (also interned) source activities hit by identity
+            for val in vals: sheet_map.setdefault(sys.intern(val),[]).append(instr_name)
+    wb.close()
     return result
 
-# ---------- MAIN ----------
-def generate_output(events_file,staff_file,output_file):
-    log_lines.clear()
-    instructors_map = preload_staff(staff_file)
-    log("✅ Preloaded instructors map")
-    wb_src = load_workbook(events_file,data_only=True)
-    dropdown_map = preload_dropdowns(wb_src)
-    log("✅ Preloaded dropdown data")
+# ---------- SHEET ----------
+NO_INSTRUCTORS = ()
 
-    wb_out = Workbook()
-    wb_out.remove(wb_out.active)
-    event_color_cache={}
+def process_sheet(ws_src,sheet_upper,dropdown_map,instructors_map,colored=True):
+    # returns [(values,fill)] output rows, or None when required columns are missing
+    sheet_name = ws_src.title
+    header=next(ws_src.iter_rows(max_row=1,values_only=True),())
+    header_map={safe_str(v).lower():i for i,v in enumerate(header,start=1)}
+    resort_col=header_map.get("resort name")
+    activity_col=header_map.get("activity")
+    bookable_col=header_map.get("bookable hours")
+    month_col=header_map.get("month")
+    duration_col=header_map.get("activity duration")
+    if not (month_col and activity_col and bookable_col): return None
 
-    for sheet_name in wb_src.sheetnames:
-        if sheet_name.upper() not in TARGET_SHEETS: continue
-        ws_src = wb_src[sheet_name]
-        ws_out = wb_out.create_sheet(sheet_name)
-        add_headers(ws_out)
-
-        header_map={safe_str(ws_src.cell(1,c).value).lower():c for c in range(1,ws_src.max_column+1)}
-        resort_col=header_map.get("resort name")
-        activity_col=header_map.get("activity")
-        bookable_col=header_map.get("bookable hours")
-        month_col=header_map.get("month")
-        duration_col=header_map.get("activity duration")
-        if not (month_col and activity_col and bookable_col):
-            log(f"⚠️ Skipping sheet {sheet_name}: missing required columns")
-            continue
-
-        date_start_col=month_col+1
-        max_check_col=min(ws_src.max_column,date_start_col+31-1)
-        out_row=2
-
-        # collect resorts per activity
-        activity_resorts={}
-        for r in range(2,ws_src.max_row+1):
-            act=safe_str(ws_src.cell(r,activity_col).value)
-            res=safe_str(ws_src.cell(r,resort_col).value) if resort_col else ""
-            if act: activity_resorts.setdefault(act,set()).add(res)
-
-        seen_events=set()
-        for r in range(2,ws_src.max_row+1):
-            activity=safe_str(ws_src.cell(r,activity_col).value)
-            if not activity: continue
-            resort=safe_str(ws_src.cell(r,resort_col).value) if resort_col else ""
-            duration=safe_str(ws_src.cell(r,duration_col).value) if duration_col else ""
-            month_val=ws_src.cell(r,month_col).value
-            if sheet_name.upper()=="GALAXEA" and "day" in duration.lower(): continue
-
-            # first valid day
-            first_day=None
-            for col in range(date_start_col,max_check_col+1):
-                c=ws_src.cell(r,col)
-                try:
-                    if c.value is not None and float(c.value)>0:
-                        first_day=int(ws_src.cell(1,col).value)
-                        break
-                except: continue
-            if not first_day: continue
-            month_num=parse_month_to_num(month_val)
-            if not month_num: continue
-            date_str=f"{first_day:02d}/{month_num:02d}/{YEAR_FOR_OUTPUT}"
-
-            resorts_for_activity=activity_resorts.get(activity,set())
-            event_name=f"{activity} - {resort}" if len(resorts_for_activity)>1 and resort else activity
-            instrs=instructors_map.get(sheet_name,{}).get(activity,[])
-
-            if event_name not in event_color_cache:
-                event_color_cache[event_name]=get_light_fill()
-            fill=event_color_cache[event_name]
-
-            bookable_cell=ws_src.cell(r,bookable_col)
-            time_slots=get_dropdown_values(ws_src,bookable_cell,dropdown_map)
-            log(f"➡️ Activity: {activity}, Cell: {bookable_cell.coordinate}, Time slots: {time_slots}, Instructors: {instrs}")
-
-            for slot in time_slots:
-                slot=slot.strip()
-                if not slot: continue
-                if "-" in slot: start_time,end_time=[p.strip() for p in slot.split("-",1)]
-                else: start_time,end_time=slot,""
-                key=(event_name,resort,activity,date_str,start_time,end_time)
-                if key in seen_events: continue
-                seen_events.add(key)
-
-                # event row
-                for col_idx,val in enumerate([event_name,activity,activity,date_str,start_time,end_time],start=1):
-                    ws_out.cell(out_row,col_idx,value=val).fill=fill
-                out_row+=1
-                # instructor rows
-                for instr in instrs:
-                    for col_idx,val in enumerate([event_name,instr,activity,date_str,start_time,end_time],start=1):
-                        ws_out.cell(out_row,col_idx,value=val).fill=fill
-                    out_row+=1
+    date_start_col=month_col+1
+    max_check_col=min(len(header),date_start_col+31-1)
+
+    # 0-based row indices, resolved once per sheet
+    activity_idx=activity_col-1
+    resort_idx=resort_col-1 if resort_col else None
+    duration_idx=duration_col-1 if duration_col else None
+    check_duration=sheet_upper=="GALAXEA" and duration_idx is not None
+    month_idx=month_col-1
+    date_start_idx=date_start_col-1
+    day_cols=get_day_columns(header,date_start_idx,max_check_col)
+    bookable_letter=get_column_letter(bookable_col)
+    bookable_dropdowns=get_column_dropdowns(ws_src,bookable_col,dropdown_map)
+    sheet_instructors=instructors_map.get(sheet_name,{})
+
+    # buffer the rows and spot activities offered at more than one resort in the same pass
+    rows=[]
+    first_resort={}
+    multi_resort=set()
+    # bound once; these run for every source row
+    intern,buffer_row=sys.intern,rows.append
+    for r,row in enumerate(ws_src.iter_rows(min_row=2,max_col=len(header),values_only=True),start=2):
+        activity=row[activity_idx]
+        if activity is None: continue  # blank rows: skip before any string work
+        activity=safe_str(activity)
+        if not activity: continue
+        # a small vocabulary repeated down the sheet; interned keys compare by identity
+        activity=intern(activity)
+        resort=intern(safe_str(row[resort_idx])) if resort_idx is not None else ""
+        if first_resort.setdefault(activity,resort)!=resort: multi_resort.add(activity)
+        # GALAXEA skips full-day activities, but they still count towards resorts
+        if check_duration and "day" in safe_str(row[duration_idx]).casefold(): continue
+        buffer_row(RowView(r,activity,resort,row[month_idx],row))
+
+    seen_events=set()
+    out_rows=[]
+    mark_seen,emit=seen_events.add,out_rows.extend
+    for r,activity,resort,month_val,row in rows:
+        # cheapest filters first; the day scan walks up to 31 cells
+        month_num=parse_month_to_num(month_val)
+        if not month_num: continue
+        time_slots=get_dropdown_values(bookable_dropdowns,r)
+        if not time_slots: continue
+        first_day=find_first_day(row,day_cols)
+        if not first_day: continue
+        date_str=f"{first_day:02d}/{month_num:02d}/{YEAR_FOR_OUTPUT}"
+
+        event_name=f"{activity} - {resort}" if resort and activity in multi_resort else activity
+        instrs=sheet_instructors.get(activity,NO_INSTRUCTORS)
+
+        fill=get_light_fill(event_name) if colored else None
+        # event row (resource = activity), then one row per instructor; same for every slot
+        prefixes=[(event_name,resource,activity,date_str) for resource in (activity,*instrs)]
+
+        logger.debug("➡️ Activity: %s, Cell: %s%d, Time slots: %s, Instructors: %s",activity,bookable_letter,r,time_slots,instrs)
+
+        for times in time_slots:
+            start_time,end_time=times
+            # event_name follows from activity/resort and date_str from the two ints
+            key=(activity,resort,first_day,month_num,start_time,end_time)
+            if key in seen_events: continue
+            mark_seen(key)
+            emit((prefix+times,fill) for prefix in prefixes)
+    return out_rows
+
+def make_row(ws,values,style):
+    cells = []
+    for val in values:
+        c = WriteOnlyCell(ws,value=val)
+        c._style = copy(style)
+        cells.append(c)
+    return cells
 
+def write_rows(ws_out,out_rows):
+    # register each fill once, then stamp its style ids onto the cells
+    fill_styles={}
+    append=ws_out.append
+    for values,fill in out_rows:
+        style=fill_styles.get(fill)
+        if style is None:
+            c=WriteOnlyCell(ws_out)
+            c.fill=fill
+            style=fill_styles[fill]=c._style
+        append(make_row(ws_out,values,style))
+
+def add_output_sheet(wb_out,sheet_name):
+    ws_out = wb_out.create_sheet(sheet_name)
+    # write_only sheets take column widths only before the first append
+    for idx,width in enumerate(COLUMN_WIDTHS,start=1):
+        ws_out.column_dimensions[get_column_letter(idx)].width = width
+    add_headers(ws_out)
+    return ws_out
+
+def write_xlsx(output_file,sheets):
+    wb_out = Workbook(write_only=True)
+    for sheet_name,out_rows in sheets:
+        ws_out = add_output_sheet(wb_out,sheet_name)  # skipped sheets keep just the headers
+        if out_rows: write_rows(ws_out,out_rows)
     wb_out.save(output_file)
+
+def write_csv(output_file,sheets):
+    # plain values only, one file for all sheets, written as each sheet finishes
+    with open(output_file,"w",newline="",encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Sheet",*HEADERS])
+        for sheet_name,out_rows in sheets:
+            if out_rows: writer.writerows((sheet_name,*values) for values,_ in out_rows)
+
+OUTPUT_WRITERS = {"xlsx":write_xlsx,"csv":write_csv}
+
+def iter_target_sheets(wb_src,instructors_map,colored):
+    # (sheet_name,out_rows) per target sheet; out_rows is None when the sheet is skipped
+    dropdown_map = {}  # (sheet,range) -> values, filled by resolve_dropdown
+    for sheet_name in wb_src.sheetnames:
+        sheet_upper = sheet_name.upper()
+        if sheet_upper not in TARGET_SHEETS: continue
+        out_rows = process_sheet(wb_src[sheet_name],sheet_upper,dropdown_map,instructors_map,colored)
+        if out_rows is None: log(f"⚠️ Skipping sheet {sheet_name}: missing required columns")
+        yield sheet_name,out_rows
+
+# ---------- MAIN ----------
+def generate_output(events_file,staff_file,output_file,output_format="xlsx"):
+    write_output = OUTPUT_WRITERS.get(output_format)
+    if write_output is None: raise ValueError(f"Unsupported output format: {output_format}")
+    log_lines.clear()
+    instructors_map = preload_staff(staff_file)
+    log("✅ Preloaded instructors map")
+    wb_src = load_read_only(events_file)
+    # only the xlsx output carries the event fills
+    write_output(output_file,iter_target_sheets(wb_src,instructors_map,colored=output_format=="xlsx"))
+    wb_src.close()
     log(f"✅ Output saved to {output_file}")
     return log_lines